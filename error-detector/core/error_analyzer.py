@@ -1,15 +1,237 @@
 """Analyzes SLURM error files for known error patterns."""
 
+import copy
 import json
+import mmap
+import os
 import re
 from pathlib import Path
 
+TAIL_LINES = 20
+TAIL_BYTES_PER_LINE = 512  # Initial read window per wanted line (generous average line length)
+TAIL_WINDOW_RETRIES = 2  # Times the window may double when lines turn out longer
+MMAP_THRESHOLD = 1 << 20  # Files larger than this are tailed through mmap
+RESULT_CACHE_SIZE = 256
+
+
+def _read_tail_lines(path: Path, num_lines: int) -> list:
+    """Return (up to) the last num_lines lines of a file, touching only its end.
+
+    The tail window starts at num_lines * TAIL_BYTES_PER_LINE bytes and may double at most
+    TAIL_WINDOW_RETRIES times, so memory stays bounded even for logs with huge lines.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size > MMAP_THRESHOLD:
+            try:
+                return _read_tail_mmap(f, size, num_lines)
+            except (OSError, ValueError):
+                pass  # Not mappable (e.g. some network filesystems): use plain reads
+        return _read_tail_window(f, size, num_lines)
+
+
+def _read_tail_window(f, size: int, num_lines: int) -> list:
+    """Tail via seek+read of a window at the end, widened only if it holds too few lines."""
+    window = num_lines * TAIL_BYTES_PER_LINE
+    buf = b""
+    end = size
+    for attempt in range(TAIL_WINDOW_RETRIES + 1):
+        start = max(0, size - window)
+        f.seek(start)
+        # Only the newly uncovered prefix is read on a retry
+        buf = f.read(end - start) + buf
+        end = start
+        lines = buf.decode("utf-8", errors="replace").splitlines()
+        if start == 0 or len(lines) > num_lines or attempt == TAIL_WINDOW_RETRIES:
+            break
+        window *= 2
+    if start > 0:
+        lines = lines[1:]  # The window began mid-line
+    return lines[-num_lines:]
+
+
+def _read_tail_mmap(f, size: int, num_lines: int) -> list:
+    """Tail via mmap: newlines are located in the page cache, and only the tail is copied out."""
+    floor = max(0, size - num_lines * TAIL_BYTES_PER_LINE * 2 ** TAIL_WINDOW_RETRIES)
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = size
+        # num_lines + 1 newlines back (counting a trailing one) is a line boundary with at least
+        # num_lines lines after it
+        for _ in range(num_lines + 1):
+            pos = mm.rfind(b"\n", floor, pos)
+            if pos < 0:
+                break
+        start = pos + 1 if pos >= 0 else floor
+        buf = mm[start:]
+    lines = buf.decode("utf-8", errors="replace").splitlines()
+    if pos < 0 and floor > 0:
+        lines = lines[1:]  # Gave up at the floor, which is mid-line
+    return lines[-num_lines:]
+
+
+_QUANTIFIER_RE = re.compile(r"\{\d*(?:,\d*)?\}")
+_FLAGS_PREFIX_RE = re.compile(r"\(\?[aiLmsux-]")
+# Constructs whose result depends on text around the line (string anchors, word boundaries,
+# lookarounds, conditionals): scanning the joined tail would change what they match
+_LINE_CONTEXT_RE = re.compile(r"\\[AZbB]|\(\?<?[=!]|\(\?\(")
+# Atoms that can match the "\n" joining the tail (\s, \W, \D, negated classes, newline escapes,
+# DOTALL) and possessive/atomic matching, which cannot give such a newline back once consumed
+_NEWLINE_RE = re.compile(
+    r"\\[sWDnN]|\\x0[aA]|\\0?12|\\u000[aA]|\\U0000000[aA]|\[\^|\(\?[aiLmux]*s|\n"
+    r"|[*+?}]\+|\(\?>"
+)
+# Numbered back-references: the alternation renumbers groups, so \1 would point elsewhere
+_BACKREF_RE = re.compile(r"\\[1-9]")
+# Escapes that stand for exactly one (non-literal) position or character
+_CLASS_ESCAPES = set("dDsSwWbBAZ")
+
+
+def _skip_group(pattern: str, i: int, open_char: str, close_char: str) -> int:
+    """Return the index just past the group/class opened at pattern[i]."""
+    depth = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "[" and open_char == "(":
+            i = _skip_group(pattern, i, "[", "]")
+            continue
+        if c == open_char and (open_char == "(" or depth == 0):
+            depth += 1
+            if open_char == "[":
+                # A ']' straight after '[' or '[^' is a literal member of the class
+                i += 1
+                if pattern.startswith("^", i):
+                    i += 1
+                if pattern.startswith("]", i):
+                    i += 1
+                continue
+        elif c == close_char:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _split_branches(pattern: str) -> list:
+    """Split a regex on its top-level '|' alternations."""
+    branches = []
+    start = i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+        elif c == "(":
+            i = _skip_group(pattern, i, "(", ")")
+        elif c == "[":
+            i = _skip_group(pattern, i, "[", "]")
+        elif c == "|":
+            branches.append(pattern[start:i])
+            i += 1
+            start = i
+        else:
+            i += 1
+    branches.append(pattern[start:])
+    return branches
+
+
+def _branch_literal(branch: str) -> str | None:
+    """Longest ASCII literal run every match of this branch must contain, or None."""
+    runs = []
+    run = ""
+    i = 0
+    while i < len(branch):
+        c = branch[i]
+        if c == "\\":
+            escaped = branch[i + 1:i + 2]
+            if escaped.isascii() and escaped.isalnum():
+                if escaped not in _CLASS_ESCAPES:
+                    return None  # \x41, \1, \N{...}: not worth decoding
+                runs.append(run)
+                run = ""
+            elif escaped.isascii():
+                run += escaped
+            else:
+                runs.append(run)
+                run = ""
+            i += 2
+            continue
+        if c in "*?" or (c == "{" and _QUANTIFIER_RE.match(branch, i)):
+            # The quantified character may be absent
+            runs.append(run[:-1])
+            run = ""
+            i = _QUANTIFIER_RE.match(branch, i).end() if c == "{" else i + 1
+            continue
+        if c in "([.^$+" or not c.isascii():
+            # '+' keeps the character it repeats: at least one occurrence is required
+            runs.append(run)
+            run = ""
+            if c == "(":
+                i = _skip_group(branch, i, "(", ")")
+            elif c == "[":
+                i = _skip_group(branch, i, "[", "]")
+            else:
+                i += 1
+            continue
+        run += c
+        i += 1
+    runs.append(run)
+    longest = max(runs, key=len)
+    return longest.lower() or None
+
+
+def _required_literals(pattern: str) -> tuple | None:
+    """Lowercased literals, one per top-level branch, such that any match contains one of them.
+
+    Returns None when no such set can be derived (inline flags, a branch without a literal run).
+    """
+    if _FLAGS_PREFIX_RE.match(pattern):
+        return None
+    literals = []
+    for branch in _split_branches(pattern):
+        literal = _branch_literal(branch)
+        if literal is None:
+            return None
+        literals.append(literal)
+    return tuple(literals)
+
 
 class ErrorAnalyzer:
     def __init__(self, patterns_file: str):
-        with open(patterns_file) as f:
-            data = json.load(f)
+        data = json.loads(Path(patterns_file).read_bytes())
         self.patterns = data.get("patterns", [])
+        # Compile once; analyze() runs for every termination and array sub-task
+        self.compiled = []
+        for pattern_def in self.patterns:
+            try:
+                regex = re.compile(pattern_def["regex"], re.IGNORECASE)
+            except re.error:
+                continue
+            self.compiled.append((pattern_def["name"], regex))
+        # (absolute path, mtime_ns, size, max_lines) -> analysis; appends change mtime/size
+        self._results = {}
+        # Cheap substring gate per pattern: if none of its literals occur, it cannot match
+        self.literals = [_required_literals(regex.pattern) for _, regex in self.compiled]
+        # All patterns fused into one alternation: a line that misses it can match none of them,
+        # so only lines that hit it are re-checked against the individual patterns. MULTILINE
+        # keeps ^/$ anchored per line when it scans the joined text in one go; patterns that look
+        # beyond their own line, can match its newline or refer to groups by number fall back to
+        # checking every line.
+        if not self.compiled or any(_LINE_CONTEXT_RE.search(regex.pattern)
+                                    or _NEWLINE_RE.search(regex.pattern)
+                                    or _BACKREF_RE.search(regex.pattern)
+                                    for _, regex in self.compiled):
+            self.union = None
+        else:
+            try:
+                self.union = re.compile(
+                    "|".join(f"(?:{regex.pattern})" for _, regex in self.compiled),
+                    re.IGNORECASE | re.MULTILINE,
+                )
+            except re.error:
+                self.union = None
 
     def analyze(self, error_file: str, max_lines: int = 500) -> dict:
         """
@@ -34,7 +256,13 @@ class ErrorAnalyzer:
             }
 
         try:
-            text = path.read_text(errors="replace")
+            st = path.stat()
+            # Array sub-tasks often share one error file: an unchanged file is not re-scanned
+            key = (os.path.abspath(error_file), st.st_mtime_ns, st.st_size, max_lines)
+            if key in self._results:
+                return copy.deepcopy(self._results[key])
+            # Only read the tail of the file to avoid OOM on huge files
+            lines = _read_tail_lines(path, max(max_lines, TAIL_LINES))
         except Exception as e:
             return {
                 "has_errors": True,
@@ -44,36 +272,85 @@ class ErrorAnalyzer:
                 "tail": [],
             }
 
-        lines = text.splitlines()
-        # Only check last max_lines to avoid OOM on huge files
-        check_lines = lines[-max_lines:] if len(lines) > max_lines else lines
+        check_start = max(0, len(lines) - max_lines)
+        tail_start = max(0, len(lines) - TAIL_LINES)
+        # Stripped/truncated once; matches inside the tail reuse these instead of re-stripping
+        tail = [line.strip()[:200] for line in lines[tail_start:]]
 
         matched = []
         relevant = []
 
-        for pattern_def in self.patterns:
-            try:
-                regex = re.compile(pattern_def["regex"], re.IGNORECASE)
-            except re.error:
-                continue
+        blob = "\n".join(lines[check_start:])
+        remaining = list(range(len(self.compiled)))
+        # The lowercase gate is only exact for ASCII text: IGNORECASE also folds a few
+        # non-ASCII characters (e.g. U+212A KELVIN SIGN) onto ASCII letters
+        if blob.isascii():
+            lowered = blob.lower()
+            remaining = [i for i in remaining if self.literals[i] is None
+                         or any(lit in lowered for lit in self.literals[i])]
 
-            for line in check_lines:
-                if regex.search(line):
-                    name = pattern_def["name"]
-                    if name not in matched:
-                        matched.append(name)
-                        relevant.append(line.strip()[:200])
-                    break  # One match per pattern is enough
+        # Index of the first matching line per pattern, keyed by index into self.compiled
+        first_hits = {}
+        candidates = self._candidate_lines(lines, blob, check_start) if remaining else ()
+        for line_no in candidates:
+            line = lines[line_no]
+            hits = [i for i in remaining if self.compiled[i][1].search(line)]
+            if not hits:
+                continue
+            for i in hits:
+                first_hits[i] = line_no
+            remaining = [i for i in remaining if i not in first_hits]
+            if not remaining:
+                break  # Every pattern has matched; the rest of the file cannot add anything
 
-        tail = lines[-20:] if len(lines) >= 20 else lines
+        # Report in pattern order, one match per pattern name
+        for i, (name, _) in enumerate(self.compiled):
+            if i in first_hits and name not in matched:
+                matched.append(name)
+                line_no = first_hits[i]
+                if line_no >= tail_start:
+                    relevant.append(tail[line_no - tail_start])
+                else:
+                    relevant.append(lines[line_no].strip()[:200])
 
         has_errors = len(matched) > 0
         summary = ", ".join(matched) if matched else "No known error patterns detected"
 
-        return {
+        result = {
             "has_errors": has_errors,
             "error_summary": summary,
             "matched_patterns": matched,
             "relevant_lines": relevant[:10],
-            "tail": [line.strip()[:200] for line in tail],
+            "tail": tail,
         }
+        if len(self._results) >= RESULT_CACHE_SIZE:
+            del self._results[next(iter(self._results))]  # Evict the oldest entry
+        self._results[key] = copy.deepcopy(result)
+        return result
+
+    def _candidate_lines(self, lines: list, blob: str, start: int):
+        """Yield indices of the lines in lines[start:] (joined as blob) that may match some pattern.
+
+        The fused alternation runs over the joined text, so lines without any hit never cost a
+        Python-level iteration. After a hit, the scan resumes at the next line so every hit line
+        is reported once and gets the exact per-line check.
+        """
+        if self.union is None:
+            yield from range(start, len(lines))
+            return
+        if start >= len(lines):
+            return  # Empty file: the joined text would be indistinguishable from one empty line
+        search = self.union.search
+        pos = 0
+        line_no = start
+        while True:
+            m = search(blob, pos)
+            if m is None:
+                return
+            line_no += blob.count("\n", pos, m.start())
+            yield line_no
+            line_end = blob.find("\n", m.start())
+            if line_end < 0:
+                return
+            pos = line_end + 1
+            line_no += 1
@@ -1,20 +1,23 @@
 """Core monitoring loop: polls SLURM, detects completion, triggers analysis + notification."""
 
+import functools
 import json
 import os
+import random
+import select
+import shutil
 import subprocess
 import sys
 import time
 from pathlib import Path
 
-# Add parent directory to path for imports
-BASE_DIR = Path(__file__).resolve().parent.parent
-sys.path.insert(0, str(BASE_DIR))
+from .error_analyzer import ErrorAnalyzer
+from .notifier import DiscordNotifier
+from .state import StateManager
+from .submitter import _substitute_slurm_vars
+from .watcher import FileWatcher
 
-from core.error_analyzer import ErrorAnalyzer
-from core.notifier import DiscordNotifier
-from core.state import StateManager
-from core.submitter import _substitute_slurm_vars
+BASE_DIR = Path(__file__).resolve().parent.parent
 
 TERMINAL_STATES = {
     "COMPLETED", "FAILED", "CANCELLED", "TIMEOUT",
@@ -24,22 +27,62 @@ TERMINAL_STATES = {
 
 POLL_INTERVAL_RUNNING = 30
 POLL_INTERVAL_PENDING = 60
+MIN_POLL_INTERVAL = 10
+MAX_POLL_INTERVAL = 300
+DAEMON_READY_TIMEOUT = 2.0  # How long daemonize_and_monitor() waits for the daemon to start
+SQUEUE_TIMEOUT = 30
+SQUEUE_TIMEOUT_MAX = 60
+SQUEUE_FORMAT = "%i|%F|%A|%T"  # job id | array job id | raw job id | state
 SACCT_RETRY_COUNT = 5
 SACCT_RETRY_DELAY = 10
+SACCT_RETRY_MAX_DELAY = 30
+SACCT_TIMEOUT = 30
+# Worst case for the final sacct query: every attempt times out and waits the maximum backoff
+FINAL_CHECK_BUDGET = SACCT_RETRY_COUNT * (SACCT_TIMEOUT + SACCT_RETRY_MAX_DELAY)
+
 
+# One notifier per (success, error) webhook pair, reused for the daemon's lifetime
+_NOTIFIERS = {}
 
+
+@functools.lru_cache(maxsize=1)
 def load_config() -> dict:
     config_path = BASE_DIR / "config.json"
     if not config_path.exists():
         print(f"[jobmon] ERROR: config.json not found at {config_path}", file=sys.stderr)
         sys.exit(1)
-    with open(config_path) as f:
-        return json.load(f)
+    return json.loads(config_path.read_bytes())
+
+
+@functools.lru_cache(maxsize=1)
+def _get_analyzer() -> ErrorAnalyzer:
+    """Build the ErrorAnalyzer (pattern load + regex compile) once per process."""
+    return ErrorAnalyzer(str(BASE_DIR / "patterns" / "error_patterns.json"))
+
+
+def _get_notifier(config: dict) -> DiscordNotifier:
+    """Return the cached DiscordNotifier for the webhooks in config."""
+    key = (config["discord"]["success_webhook"], config["discord"]["error_webhook"])
+    if key not in _NOTIFIERS:
+        _NOTIFIERS[key] = DiscordNotifier(*key)
+    return _NOTIFIERS[key]
+
+
+def _close_notifiers():
+    """Flush and close every cached notifier (monitor shutdown)."""
+    for notifier in _NOTIFIERS.values():
+        notifier.close()
+    _NOTIFIERS.clear()
 
 
 def daemonize_and_monitor(job_id: str, error_file: str, output_file: str,
-                          job_name: str = "", is_array: bool = False):
-    """Double-fork to create a daemon process that monitors the job."""
+                          job_name: str = "", is_array: bool = False, use_inotify: bool = True,
+                          in_place: bool = True):
+    """Double-fork to create a daemon process that monitors the job.
+    With JOBMON_NO_DOUBLE_FORK=1 (and in_place) the calling process becomes the daemon itself
+    and never returns; callers that start several monitors pass in_place=False.
+    use_inotify=False makes the daemon sleep between polls without watching the log files.
+    """
     state = StateManager(job_id)
 
     # Check for duplicate monitor
@@ -47,25 +90,48 @@ def daemonize_and_monitor(job_id: str, error_file: str, output_file: str,
         print(f"[jobmon] Monitor already running for job {job_id}")
         return
 
-    # First fork
-    pid = os.fork()
-    if pid > 0:
-        # Parent: record the child info and return
-        # Wait briefly for grandchild PID to be written
-        time.sleep(0.5)
-        return
+    ready_w = None
+    if in_place and os.environ.get("JOBMON_NO_DOUBLE_FORK") == "1":
+        # The launcher already detached us (e.g. `setsid nohup jobmon watch <id> &`):
+        # become the daemon in place instead of paying for two forks
+        if os.getsid(0) != os.getpid():  # `setsid` launchers already made us a session leader
+            try:
+                os.setsid()
+            except PermissionError:
+                pass  # A process group leader (e.g. a shell `&` job) cannot start a session
+    else:
+        # The daemon writes a byte to this pipe once its state file exists
+        ready_r, ready_w = os.pipe()
+
+        # First fork
+        pid = os.fork()
+        if pid > 0:
+            # Parent: reap the first child (it exits right after the second fork), then wait
+            # for the daemon's ready byte; EOF means it died before getting that far
+            os.close(ready_w)
+            os.waitpid(pid, 0)
+            ready, _, _ = select.select([ready_r], [], [], DAEMON_READY_TIMEOUT)
+            started = bool(ready) and os.read(ready_r, 1) == b"1"
+            os.close(ready_r)
+            if not started:
+                print(f"[jobmon] Warning: monitor for job {job_id} did not report ready; "
+                      f"check {BASE_DIR / 'logs' / f'{job_id}.monitor.log'}")
+            return
 
-    # Child: create new session
-    os.setsid()
+        # Child: create new session
+        os.close(ready_r)
+        os.setsid()
 
-    # Second fork
-    pid2 = os.fork()
-    if pid2 > 0:
-        # First child exits
-        os._exit(0)
+        # Second fork
+        pid2 = os.fork()
+        if pid2 > 0:
+            # First child exits
+            os._exit(0)
 
-    # Grandchild: this is the daemon
+    # Grandchild (or the detached launcher process): this is the daemon
     grandchild_pid = os.getpid()
+    # Notifiers inherited across fork() have no worker thread; let the daemon build its own
+    _NOTIFIERS.clear()
 
     # Redirect stdout/stderr to log file
     log_dir = BASE_DIR / "logs"
@@ -89,26 +155,35 @@ def daemonize_and_monitor(job_id: str, error_file: str, output_file: str,
     os.dup2(devnull, 0)
     os.close(devnull)
 
+    # Drop any fds inherited from whatever launched jobmon (only the ready pipe is still ours),
+    # so the SLURM commands spawned without close_fds cannot leak them
+    max_fd = os.sysconf("SC_OPEN_MAX")
+    if ready_w is None:
+        os.closerange(3, max_fd)
+    else:
+        os.closerange(3, ready_w)
+        os.closerange(ready_w + 1, max_fd)
+
     # Initialize state
     state.initialize(grandchild_pid, error_file, output_file, job_name=job_name, is_array=is_array)
+    if ready_w is not None:
+        os.write(ready_w, b"1")
+        os.close(ready_w)
 
     print(f"[jobmon] Daemon started for job {job_id} (PID {grandchild_pid})")
     print(f"[jobmon] Error file: {error_file}")
     print(f"[jobmon] Output file: {output_file}")
 
     try:
-        _monitor_loop(job_id, error_file, output_file, state, job_name, is_array)
+        _monitor_loop(job_id, error_file, output_file, state, job_name, is_array,
+                      use_inotify=use_inotify)
     except Exception as e:
         print(f"[jobmon] Monitor crashed: {e}", file=sys.stderr)
         import traceback
         traceback.print_exc()
         # Try to send a notification about the crash
         try:
-            config = load_config()
-            notifier = DiscordNotifier(
-                config["discord"]["success_webhook"],
-                config["discord"]["error_webhook"],
-            )
+            notifier = _get_notifier(load_config())
             notifier.notify(
                 job_id,
                 {"state": "MONITOR_CRASH", "exit_code": "N/A", "elapsed": "N/A",
@@ -119,74 +194,146 @@ def daemonize_and_monitor(job_id: str, error_file: str, output_file: str,
         except Exception:
             pass
     finally:
+        _close_notifiers()
         os._exit(0)
 
 
 def _monitor_loop(job_id: str, error_file: str, output_file: str, state: StateManager,
-                  job_name: str = "", is_array: bool = False):
-    """Main polling loop."""
-    heartbeat_counter = 0
+                  job_name: str = "", is_array: bool = False, use_inotify: bool = True):
+    """Main polling loop. Sleeps between squeue polls, waking early when a log file is closed."""
+    # Consecutive squeue timeouts; an overloaded controller gets polled less often, not more
+    squeue_fail_streak = 0
     # Track which array sub-tasks have already been reported as failed
     reported_failures = set()
+    # With no paths the watcher degrades to a plain sleep
+    watcher = FileWatcher([error_file, output_file] if use_inotify else [])
+
+    try:
+        while True:
+            status = _check_squeue(
+                job_id, timeout=min(SQUEUE_TIMEOUT_MAX, SQUEUE_TIMEOUT + 10 * squeue_fail_streak))
+            squeue_fail_streak = squeue_fail_streak + 1 if status == "UNKNOWN" else 0
+
+            if status is None:
+                # Job no longer in queue — get final state from sacct
+                print(f"[jobmon] Job {job_id} left the queue, querying sacct...")
+                state.write_heartbeat(FINAL_CHECK_BUDGET)  # sacct retries can take minutes
+                sacct_results = _check_sacct_all_with_retry(job_id)
+                print(f"[jobmon] Final state(s): {sacct_results}")
+                _handle_termination(job_id, sacct_results, error_file, output_file, state,
+                                   job_name, is_array,
+                                   already_reported=reported_failures)
+                return
+
+            # For array jobs that are running, check sacct for early failures
+            if is_array and status == "RUNNING":
+                reported_failures = _check_early_array_failures(
+                    job_id, error_file, job_name, reported_failures)
+
+            if squeue_fail_streak:
+                interval = min(POLL_INTERVAL_RUNNING * 2 ** squeue_fail_streak, MAX_POLL_INTERVAL)
+            else:
+                interval = POLL_INTERVAL_PENDING if status == "PENDING" else POLL_INTERVAL_RUNNING
+            # Every poll: `jobmon status` judges liveness from this alone, against the interval
+            state.write_heartbeat(interval)
+            print(f"[jobmon] Job {job_id} status: {status}, next check in {interval}s")
+            started = time.monotonic()
+            if watcher.wait(interval):
+                # A log file was closed (often the job exiting): re-check squeue early, but not
+                # more often than MIN_POLL_INTERVAL for jobs that close files constantly, and not
+                # before the backoff interval while squeue keeps failing
+                elapsed = time.monotonic() - started
+                floor = interval if squeue_fail_streak else MIN_POLL_INTERVAL
+                if elapsed < floor:
+                    time.sleep(floor - elapsed)
+    finally:
+        watcher.close()
 
-    while True:
-        status = _check_squeue(job_id)
-
-        if status is None:
-            # Job no longer in queue — get final state from sacct
-            print(f"[jobmon] Job {job_id} left the queue, querying sacct...")
-            sacct_results = _check_sacct_all_with_retry(job_id)
-            print(f"[jobmon] Final state(s): {sacct_results}")
-            _handle_termination(job_id, sacct_results, error_file, output_file, state,
-                               job_name, is_array,
-                               already_reported=reported_failures)
-            return
 
-        # For array jobs that are running, check sacct for early failures
-        if is_array and status == "RUNNING":
-            reported_failures = _check_early_array_failures(
-                job_id, error_file, job_name, reported_failures)
+@functools.lru_cache(maxsize=None)
+def _slurm_executable(name: str) -> str:
+    """Absolute path of a SLURM client command (falls back to the bare name if not on PATH)."""
+    return shutil.which(name) or name
 
-        # Update heartbeat periodically
-        heartbeat_counter += 1
-        if heartbeat_counter % 2 == 0:  # Every other poll
-            state.write_heartbeat()
 
-        interval = POLL_INTERVAL_PENDING if status == "PENDING" else POLL_INTERVAL_RUNNING
-        print(f"[jobmon] Job {job_id} status: {status}, next check in {interval}s")
-        time.sleep(interval)
+def run_slurm(args: list, timeout: float) -> subprocess.CompletedProcess:
+    """Run a SLURM client command and capture its output.
+    An absolute executable path and close_fds=False let subprocess use posix_spawn instead of
+    fork()+exec() of the whole daemon. The daemon closes every inherited fd above stderr at
+    startup and the fds we open are non-inheritable, so in the daemon nothing leaks; one-shot CLI
+    commands only pass on what their own launcher handed them, like any shell command would.
+    """
+    return subprocess.run(
+        [_slurm_executable(args[0])] + args[1:],
+        capture_output=True, text=True, timeout=timeout, close_fds=False,
+    )
 
 
-def _check_squeue(job_id: str) -> str | None:
+def _check_squeue(job_id: str, timeout: float = SQUEUE_TIMEOUT) -> str | None:
     """Check if job is still in the queue. Returns state string or None.
     For array jobs, summarizes multi-line output (RUNNING if any task running, etc.).
     """
+    return check_squeue_many([job_id], timeout=timeout)[job_id]
+
+
+def check_squeue_many(job_ids: list, timeout: float = SQUEUE_TIMEOUT,
+                      error_state: str | None = None) -> dict:
+    """Check several jobs with a single squeue call. Returns {job_id: state string or None}.
+    squeue also exits non-zero ("Invalid job id") once a job has left the queue, so by default
+    its output is trusted either way; pass error_state to report that state for every job instead.
+    """
     try:
-        result = subprocess.run(
-            ["squeue", "-j", job_id, "-h", "-o", "%T"],
-            capture_output=True, text=True, timeout=30,
-        )
-        output = result.stdout.strip()
-        if not output:
-            return None
-        lines = [l.strip() for l in output.splitlines() if l.strip()]
-        if not lines:
-            return None
-        if any(s == "RUNNING" for s in lines):
-            return "RUNNING"
-        if any(s == "COMPLETING" for s in lines):
-            return "RUNNING"
-        if all(s == "PENDING" for s in lines):
-            return "PENDING"
-        return lines[0]
+        result = run_slurm(["squeue", "-j", ",".join(job_ids), "-h", "-o", SQUEUE_FORMAT],
+                           timeout=timeout)
     except subprocess.TimeoutExpired:
-        return "UNKNOWN"  # Assume still running if squeue hangs
+        return {job_id: "UNKNOWN" for job_id in job_ids}  # Assume still running if squeue hangs
+    if result.returncode != 0 and error_state is not None:
+        return {job_id: error_state for job_id in job_ids}
+
+    rows = squeue_rows(result.stdout)
+    if len(job_ids) == 1:
+        # Single job: every row belongs to it, whatever ID form squeue prints
+        return {job_ids[0]: _summarize_squeue_states([row[3] for row in rows])}
+    return match_squeue_rows(rows, job_ids)
+
+
+def squeue_rows(stdout: str) -> list:
+    """Split SQUEUE_FORMAT output into (job id, array job id, raw job id, state) rows."""
+    rows = []
+    for line in stdout.splitlines():
+        fields = line.strip().split("|")
+        if len(fields) >= 4 and fields[3]:
+            rows.append(fields[:4])
+    return rows
+
+
+def match_squeue_rows(rows: list, job_ids: list) -> dict:
+    """Summarize the squeue rows belonging to each of job_ids. Returns {job_id: state or None}."""
+    task_states = {job_id: [] for job_id in job_ids}
+    for fid, array_id, raw_id, task_state in rows:
+        # A row can be named by its array form (123_4 / 123_[5-9]), base array ID or raw job ID
+        for key in {fid, fid.split("_", 1)[0], array_id, raw_id}:
+            if key in task_states:
+                task_states[key].append(task_state)
+    return {job_id: _summarize_squeue_states(states) for job_id, states in task_states.items()}
+
+
+def _summarize_squeue_states(states: list) -> str | None:
+    """Collapse per-task squeue states into one job state (RUNNING if any task running, etc.)."""
+    if not states:
+        return None
+    if any(s == "RUNNING" for s in states):
+        return "RUNNING"
+    if any(s == "COMPLETING" for s in states):
+        return "RUNNING"
+    if all(s == "PENDING" for s in states):
+        return "PENDING"
+    return states[0]
 
 
 def _check_sacct_all_with_retry(job_id: str) -> list:
     """Query sacct with retries. Returns list of dicts (one per sub-task or single for non-array)."""
-    unknown_fallback = [{"job_id": job_id, "state": "UNKNOWN", "exit_code": "N/A",
-                         "elapsed": "N/A", "max_rss": "N/A", "job_name": "N/A"}]
+    unknown_fallback = [_unknown_sacct_row(job_id)]
     for attempt in range(SACCT_RETRY_COUNT):
         results = _check_sacct_all(job_id)
         if not results:
@@ -194,50 +341,66 @@ def _check_sacct_all_with_retry(job_id: str) -> list:
         if results[0].get("state") != "UNKNOWN":
             return results
         print(f"[jobmon] sacct returned no data, retry {attempt + 1}/{SACCT_RETRY_COUNT}...")
-        time.sleep(SACCT_RETRY_DELAY)
+        if attempt < SACCT_RETRY_COUNT - 1:
+            # Full jitter: monitors (or a mass `jobmon recover`) that lost the same controller
+            # do not all retry in lockstep
+            time.sleep(random.uniform(0, min(SACCT_RETRY_MAX_DELAY, SACCT_RETRY_DELAY * 2 ** attempt)))
     return results
 
 
 def _check_sacct_all(job_id: str) -> list:
     """Query sacct for final job state(s). Returns list of dicts (one per sub-task or single)."""
+    return _check_sacct_many([job_id])[job_id]
+
+
+def _check_sacct_many(job_ids: list) -> dict:
+    """Query sacct for several jobs with a single call. Returns {job_id: list of state dicts}."""
     try:
-        result = subprocess.run(
-            ["sacct", "-j", job_id, "--parsable2", "--noheader",
-             "-o", "JobID,State,ExitCode,Elapsed,MaxRSS,JobName"],
-            capture_output=True, text=True, timeout=30,
-        )
+        result = run_slurm(["sacct", "-j", ",".join(job_ids), "--parsable2", "--noheader",
+                            "-o", "JobID,State,ExitCode,Elapsed,MaxRSS,JobName"],
+                           timeout=SACCT_TIMEOUT)
     except subprocess.TimeoutExpired:
-        return [{"job_id": job_id, "state": "UNKNOWN", "exit_code": "N/A",
-                 "elapsed": "N/A", "max_rss": "N/A", "job_name": "N/A"}]
-
-    results = []
-    for line in result.stdout.strip().split("\n"):
-        if not line.strip():
-            continue
-        fields = line.split("|")
+        return {job_id: [_unknown_sacct_row(job_id)] for job_id in job_ids}
+
+    # Single pass: rows are split into the job's own row and its array sub-task rows. If sacct
+    # returned both (array job), only sub-tasks are kept, to avoid analyzing a template path and
+    # sending a spurious notification for the base row
+    base_rows = {job_id: [] for job_id in job_ids}
+    sub_rows = {job_id: [] for job_id in job_ids}
+    for line in result.stdout.splitlines():
+        fields = line.split("|", 5)
         if len(fields) < 6:
             continue
         fid = fields[0]
         # Match base job ID (non-array) or sub-task IDs (e.g. 59482853_0); exclude .batch / .extern
-        if fid == job_id or (fid.startswith(job_id + "_") and "." not in fid):
-            results.append({
-                "job_id": fid,
-                "state": fields[1],
-                "exit_code": fields[2],
-                "elapsed": fields[3],
-                "max_rss": fields[4],
-                "job_name": fields[5],
-            })
+        if "." in fid:
+            continue
+        base, is_sub_task, _ = fid.partition("_")
+        row = None
+        if fid in base_rows:
+            row = _sacct_row(fields)
+            (sub_rows if is_sub_task else base_rows)[fid].append(row)
+        if is_sub_task and base in sub_rows:
+            sub_rows[base].append(row or _sacct_row(fields))
+
+    return {job_id: sub_rows[job_id] or base_rows[job_id] or [_unknown_sacct_row(job_id)]
+            for job_id in job_ids}
 
-    if not results:
-        return [{"job_id": job_id, "state": "UNKNOWN", "exit_code": "N/A",
-                "elapsed": "N/A", "max_rss": "N/A", "job_name": "N/A"}]
-    # If sacct returned both base job and sub-task rows (array job), keep only sub-tasks
-    # to avoid analyzing a template path and sending a spurious notification for the base row
-    sub_task_entries = [r for r in results if "_" in r["job_id"]]
-    if sub_task_entries:
-        return sub_task_entries
-    return results
+
+def _sacct_row(fields: list) -> dict:
+    return {
+        "job_id": fields[0],
+        "state": fields[1],
+        "exit_code": fields[2],
+        "elapsed": fields[3],
+        "max_rss": fields[4],
+        "job_name": fields[5],
+    }
+
+
+def _unknown_sacct_row(job_id: str) -> dict:
+    return {"job_id": job_id, "state": "UNKNOWN", "exit_code": "N/A",
+            "elapsed": "N/A", "max_rss": "N/A", "job_name": "N/A"}
 
 
 def _check_early_array_failures(job_id: str, error_file: str, job_name: str,
@@ -275,13 +438,8 @@ def _check_early_array_failures(job_id: str, error_file: str, job_name: str,
         return reported_failures
 
     # Send notifications for new failures
-    config = load_config()
-    patterns_file = BASE_DIR / "patterns" / "error_patterns.json"
-    analyzer = ErrorAnalyzer(str(patterns_file))
-    notifier = DiscordNotifier(
-        config["discord"]["success_webhook"],
-        config["discord"]["error_webhook"],
-    )
+    analyzer = _get_analyzer()
+    notifier = _get_notifier(load_config())
     time.sleep(3)  # Brief wait for error files to flush
 
     total = len(sub_tasks)
@@ -297,7 +455,7 @@ def _check_early_array_failures(job_id: str, error_file: str, job_name: str,
         print(f"[jobmon] Early failure detected: {sub_id} state={sacct_info['state']}")
         array_info = {"task_id": sub_id, "task_index": array_task_id, "total_tasks": total}
         success = notifier.notify(sub_id, sacct_info, analysis, array_info=array_info)
-        print(f"[jobmon] Early failure notification sent for {sub_id}: {success}")
+        print(f"[jobmon] Early failure notification queued for {sub_id}: {success}")
         reported_failures.add(sub_id)
 
     return reported_failures
@@ -313,13 +471,8 @@ def _handle_termination(job_id: str, sacct_results: list, error_file: str,
     """
     if already_reported is None:
         already_reported = set()
-    config = load_config()
-    patterns_file = BASE_DIR / "patterns" / "error_patterns.json"
-    analyzer = ErrorAnalyzer(str(patterns_file))
-    notifier = DiscordNotifier(
-        config["discord"]["success_webhook"],
-        config["discord"]["error_webhook"],
-    )
+    analyzer = _get_analyzer()
+    notifier = _get_notifier(load_config())
 
     # Wait a bit for error files to be flushed
     time.sleep(5)
@@ -341,7 +494,7 @@ def _handle_termination(job_id: str, sacct_results: list, error_file: str,
         print(f"[jobmon] Analysis: has_errors={analysis['has_errors']}, "
               f"patterns={analysis['matched_patterns']}")
         success = notifier.notify(job_id, sacct_info, analysis)
-        print(f"[jobmon] Discord notification sent: {success}")
+        print(f"[jobmon] Discord notification queued: {success}")
         state.mark_complete(state_str)
         print(f"[jobmon] Monitoring complete for job {job_id}")
         return
@@ -355,6 +508,11 @@ def _handle_termination(job_id: str, sacct_results: list, error_file: str,
     for sacct_info in sacct_results:
         sub_id = sacct_info.get("job_id", "")
         state_str = sacct_info.get("state", "")
+        # Skip if already reported during early failure detection (it was a failure then)
+        if sub_id in already_reported:
+            all_success = False
+            print(f"[jobmon] Sub-task {sub_id} already reported — skipping")
+            continue
         if state_str.startswith("CANCELLED"):
             cancelled_count += 1
             continue
@@ -362,10 +520,6 @@ def _handle_termination(job_id: str, sacct_results: list, error_file: str,
             completed_count += 1
             continue
         all_success = False
-        # Skip if already reported during early failure detection
-        if sub_id in already_reported:
-            print(f"[jobmon] Sub-task {sub_id} already reported — skipping")
-            continue
         # Resolve error file path for this sub-task
         array_task_id = sub_id.split("_", 1)[1] if "_" in sub_id else None
         if array_task_id is not None:
@@ -378,7 +532,7 @@ def _handle_termination(job_id: str, sacct_results: list, error_file: str,
               f"patterns={analysis['matched_patterns']}")
         array_info = {"task_id": sub_id, "task_index": array_task_id, "total_tasks": total}
         success = notifier.notify(sub_id, sacct_info, analysis, array_info=array_info)
-        print(f"[jobmon] Discord notification sent for {sub_id}: {success}")
+        print(f"[jobmon] Discord notification queued for {sub_id}: {success}")
 
     # All cancelled: skip notification (do not send false "COMPLETED" summary)
     if cancelled_count == total:
@@ -400,7 +554,7 @@ def _handle_termination(job_id: str, sacct_results: list, error_file: str,
         summary_analysis = {"has_errors": False, "matched_patterns": [], "error_summary": ""}
         array_info = {"total_tasks": total, "all_success": True}
         notifier.notify(base_id, summary_info, summary_analysis, array_info=array_info)
-        print(f"[jobmon] Discord success summary sent for array {base_id} ({completed_count}/{total} tasks)")
+        print(f"[jobmon] Discord success summary queued for array {base_id} ({completed_count}/{total} tasks)")
 
     aggregate = "COMPLETED" if all_success else "MIXED"
     state.mark_complete(aggregate)
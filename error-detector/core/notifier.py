@@ -1,37 +1,135 @@
 """Discord webhook notifier for SLURM job status."""
 
 import json
-import requests
-from datetime import datetime
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+NOTIFY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+QUEUE_SIZE = 256
+FLUSH_TIMEOUT = 120.0  # Enough for a few notifications that each exhaust their retries
 
 
 class DiscordNotifier:
+    # Payloads are encoded once here and posted as raw bytes instead of via requests' json=
+    _encode = staticmethod(json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode)
+    _JSON_HEADERS = {"Content-Type": "application/json"}
+    _FOOTER = {"text": "SLURM Job Monitor (jobmon)"}
+    # (field name, sacct_info key) for the inline fields after Job ID
+    _FIELD_SPECS = (
+        ("State", "state"),
+        ("Exit Code", "exit_code"),
+        ("Elapsed", "elapsed"),
+        ("Job Name", "job_name"),
+        ("Max RSS", "max_rss"),
+    )
+
     def __init__(self, success_webhook: str, error_webhook: str):
+        # requests is imported here, not at module level, so CLI commands that never
+        # build a notifier (status, cancel, ...) skip its import cost
+        import requests
+        from requests.adapters import HTTPAdapter
+
         self.success_webhook = success_webhook
         self.error_webhook = error_webhook
+        # One keep-alive session for all webhook calls: only the first pays DNS/TCP/TLS setup
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0))
+
+        # Webhook calls run on a background thread so the monitor loop never blocks on Discord
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._worker = threading.Thread(target=self._deliver_queued, name="discord-notifier",
+                                        daemon=True)
+        self._worker.start()
+
+    def close(self, timeout: float = FLUSH_TIMEOUT):
+        """Deliver queued notifications, then close the pooled webhook connections."""
+        self.flush(timeout)
+        self._session.close()
+
+    def flush(self, timeout: float = FLUSH_TIMEOUT) -> bool:
+        """Wait until every queued notification has been delivered or given up on.
+        Returns False if that did not happen within timeout seconds."""
+        done = threading.Event()
+        try:
+            self._queue.put((None, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
 
     def notify(self, job_id: str, sacct_info: dict, analysis: dict, array_info: dict | None = None):
-        """Send job completion notification to the appropriate Discord channel."""
+        """Queue a job completion notification for the appropriate Discord channel.
+        Returns True once queued; delivery (with retries) happens on the background thread."""
         is_success = (
             sacct_info.get("state", "").startswith("COMPLETED")
             and sacct_info.get("exit_code", "") == "0:0"
         )
         webhook = self.success_webhook if is_success else self.error_webhook
         payload = self._build_payload(job_id, sacct_info, analysis, is_success, array_info)
+        try:
+            self._queue.put_nowait((webhook, self._encode(payload).encode("utf-8")))
+        except queue.Full:
+            print(f"[jobmon] Notification queue full, dropping notification for job {job_id}")
+            return False
+        return True
 
-        for attempt in range(3):
+    def _deliver_queued(self):
+        """Worker thread: deliver queued payloads in order; a (None, Event) entry marks a flush."""
+        while True:
+            webhook, body = self._queue.get()
+            if webhook is None:
+                body.set()
+                continue
             try:
-                resp = requests.post(webhook, json=payload, timeout=15)
-                if resp.status_code == 204:
-                    return True
-                resp.raise_for_status()
-                return True
+                self._deliver(webhook, body)
+            except Exception as e:
+                print(f"[jobmon] Discord notification failed: {e}")
+
+    def _deliver(self, webhook: str, body: bytes) -> bool:
+        """POST one payload, retrying recoverable failures with backoff."""
+        import requests
+
+        for attempt in range(NOTIFY_ATTEMPTS):
+            retry_after = None
+            try:
+                # stream=True: Discord's usual 204 has no body, so nothing is read for it;
+                # any other body is drained so the pooled connection can be reused
+                with self._session.post(webhook, data=body, headers=self._JSON_HEADERS, timeout=15,
+                                        stream=True) as resp:
+                    if resp.status_code != 204:
+                        _ = resp.content  # Drain the body so the connection returns to the pool
             except requests.RequestException as e:
-                if attempt == 2:
-                    print(f"[jobmon] Failed to send Discord notification after 3 attempts: {e}")
+                error = e  # Connection errors and timeouts are worth retrying
+            else:
+                if resp.status_code < 400:
+                    return True
+                error = f"HTTP {resp.status_code}"
+                if resp.status_code != 429 and resp.status_code < 500:
+                    # Bad webhook URL or payload: retrying cannot help
+                    print(f"[jobmon] Discord rejected notification ({error}), not retrying")
                     return False
+                retry_after = resp.headers.get("Retry-After")
+            if attempt < NOTIFY_ATTEMPTS - 1:
+                time.sleep(self._retry_delay(attempt, retry_after))
+        print(f"[jobmon] Failed to send Discord notification after {NOTIFY_ATTEMPTS} attempts: {error}")
         return False
 
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after: str | None) -> float:
+        """Discord's Retry-After when given, else capped exponential backoff with full jitter
+        (so many jobs finishing together do not retry in lockstep)."""
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), RETRY_MAX_DELAY)
+            except ValueError:
+                pass
+        return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
     def _build_payload(self, job_id: str, sacct_info: dict, analysis: dict, is_success: bool,
                       array_info: dict | None = None) -> dict:
         if is_success:
@@ -46,14 +144,9 @@ class DiscordNotifier:
             state = sacct_info.get("state", "UNKNOWN")
             title = f"\u274C Job `{job_id}` {state}"
 
-        fields = [
-            {"name": "Job ID", "value": f"`{job_id}`", "inline": True},
-            {"name": "State", "value": sacct_info.get("state", "N/A"), "inline": True},
-            {"name": "Exit Code", "value": sacct_info.get("exit_code", "N/A"), "inline": True},
-            {"name": "Elapsed", "value": sacct_info.get("elapsed", "N/A"), "inline": True},
-            {"name": "Job Name", "value": sacct_info.get("job_name", "N/A"), "inline": True},
-            {"name": "Max RSS", "value": sacct_info.get("max_rss", "N/A") or "N/A", "inline": True},
-        ]
+        fields = [{"name": "Job ID", "value": f"`{job_id}`", "inline": True}]
+        fields += [{"name": name, "value": sacct_info.get(key) or "N/A", "inline": True}
+                   for name, key in self._FIELD_SPECS]
         if array_info:
             task_idx = array_info.get("task_index") or array_info.get("task_id", "")
             total = array_info.get("total_tasks", "")
@@ -97,47 +190,46 @@ class DiscordNotifier:
             "title": title,
             "color": color,
             "fields": fields,
-            "footer": {"text": "SLURM Job Monitor (jobmon)"},
-            "timestamp": datetime.utcnow().isoformat(),
+            "footer": self._FOOTER,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
         }
 
         return {"embeds": [embed]}
 
     def send_test(self):
-        """Send test messages to both channels."""
-        test_time = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+        """Send test messages to both channels (concurrently: each POST is one network round trip)."""
+        test_time = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+        channels = [
+            ("success", self.success_webhook, "\u2705 jobmon test — Success Channel", 0x2ECC71),
+            ("error", self.error_webhook, "\u274C jobmon test — Error Channel", 0xE74C3C),
+        ]
+        with ThreadPoolExecutor(max_workers=len(channels)) as ex:
+            futures = {name: ex.submit(self._send_test_message, webhook, title, color, test_time)
+                       for name, webhook, title, color in channels}
+
         results = {}
+        for name, future in futures.items():
+            ok, error = future.result()
+            results[f"{name}_channel"] = ok
+            if error is not None:
+                results[f"{name}_error"] = error
+        return results
 
-        # Test success channel
-        payload = {
-            "embeds": [{
-                "title": "\u2705 jobmon test — Success Channel",
-                "description": f"Test message sent at {test_time}",
-                "color": 0x2ECC71,
-                "footer": {"text": "SLURM Job Monitor (jobmon)"},
-            }]
-        }
-        try:
-            resp = requests.post(self.success_webhook, json=payload, timeout=15)
-            results["success_channel"] = resp.status_code in (200, 204)
-        except requests.RequestException as e:
-            results["success_channel"] = False
-            results["success_error"] = str(e)
+    def _send_test_message(self, webhook: str, title: str, color: int, test_time: str) -> tuple:
+        """POST one test embed. Returns (ok, error message or None)."""
+        import requests
 
-        # Test error channel
         payload = {
             "embeds": [{
-                "title": "\u274C jobmon test — Error Channel",
+                "title": title,
                 "description": f"Test message sent at {test_time}",
-                "color": 0xE74C3C,
-                "footer": {"text": "SLURM Job Monitor (jobmon)"},
+                "color": color,
+                "footer": self._FOOTER,
             }]
         }
         try:
-            resp = requests.post(self.error_webhook, json=payload, timeout=15)
-            results["error_channel"] = resp.status_code in (200, 204)
+            resp = self._session.post(webhook, data=self._encode(payload).encode("utf-8"),
+                                      headers=self._JSON_HEADERS, timeout=15)
         except requests.RequestException as e:
-            results["error_channel"] = False
-            results["error_error"] = str(e)
-
-        return results
+            return False, str(e)
+        return resp.status_code in (200, 204), None
@@ -0,0 +1,66 @@
+"""Short-lived squeue listing shared between jobmon invocations, so scripted
+`jobmon recover` loops hit the SLURM controller at most once per TTL."""
+
+import fcntl
+import getpass
+import os
+import subprocess
+import time
+
+from .monitor import (BASE_DIR, SQUEUE_FORMAT, SQUEUE_TIMEOUT, check_squeue_many,
+                      match_squeue_rows, run_slurm, squeue_rows)
+
+CACHE_DIR = BASE_DIR / "cache"
+SQUEUE_CACHE_TTL = 30  # Default for JOBMON_SQUEUE_TTL
+
+
+def _cache_ttl() -> float:
+    """JOBMON_SQUEUE_TTL in seconds, falling back to SQUEUE_CACHE_TTL if unset or malformed."""
+    try:
+        return float(os.environ.get("JOBMON_SQUEUE_TTL", SQUEUE_CACHE_TTL))
+    except ValueError:
+        return SQUEUE_CACHE_TTL
+
+
+def get_squeue(max_age: float | None = None) -> str | None:
+    """squeue output for all of the current user's jobs, at most max_age seconds old
+    (default JOBMON_SQUEUE_TTL). Returns None if squeue fails or times out."""
+    if max_age is None:
+        max_age = _cache_ttl()
+    user = getpass.getuser()
+    cache_path = CACHE_DIR / f"squeue-{user}.txt"
+    CACHE_DIR.mkdir(exist_ok=True)
+    with open(CACHE_DIR / f"squeue-{user}.lock", "w") as lock:
+        # One refresh at a time; concurrent callers wait and then reuse its result
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if time.time() - cache_path.stat().st_mtime < max_age:
+                return cache_path.read_text()
+        except OSError:
+            pass
+        try:
+            result = run_slurm(["squeue", "-u", user, "-h", "-o", SQUEUE_FORMAT],
+                               timeout=SQUEUE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            return None
+        if result.returncode != 0:
+            return None
+        tmp = cache_path.with_suffix(".tmp")
+        tmp.write_text(result.stdout)
+        os.replace(tmp, cache_path)
+        return result.stdout
+
+
+def get_job_states(job_ids: list, max_age: float | None = None) -> dict:
+    """Like check_squeue_many, but answered from the cached listing where possible.
+    Jobs absent from the listing (finished, or submitted since it was taken) are re-checked
+    live, so a stale cache can never make a running job look finished. If squeue is failing
+    altogether, jobs are reported as UNKNOWN rather than gone."""
+    listing = get_squeue(max_age)
+    if listing is None:
+        return check_squeue_many(job_ids, error_state="UNKNOWN")
+    states = match_squeue_rows(squeue_rows(listing), job_ids)
+    missing = [job_id for job_id, state in states.items() if state is None]
+    if missing:
+        states.update(check_squeue_many(missing))
+    return states
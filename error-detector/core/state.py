@@ -1,24 +1,93 @@
 """Manages per-job state files for monitoring tracking."""
 
+import errno
 import json
 import os
+import signal
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 STATE_DIR = Path(__file__).resolve().parent.parent / "state"
+# A monitor that has not heartbeated for this long is treated as dead without probing its PID.
+# Generous on purpose: backed-off polls can be ~6 minutes apart.
+STALE_HEARTBEAT_SECS = 1800
+# `jobmon status` calls a monitor alive while its heartbeat is younger than twice the interval it
+# announced plus this slack for slow squeue/sacct calls; no PID is probed
+HEARTBEAT_GRACE = 120
+DEFAULT_HEARTBEAT_INTERVAL = 60  # For heartbeats that do not announce an interval
+_HAS_PIDFD = hasattr(os, "pidfd_open")
+LOAD_WORKERS = 16  # Threads used to read state files in list_all()/list_recoverable()
+
+
+def _pid_start_time(pid: int) -> int | None:
+    """Start time of pid in clock ticks since boot (/proc/<pid>/stat field 22), or None if unknown."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+        # Field 2 (comm) may contain spaces and parentheses, so count fields from the last ')'
+        return int(stat[stat.rindex(b")") + 2:].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def signal_process(pid: int, sig: int, start_time: int | None = None) -> bool:
+    """Send sig to pid if it is still the process that started at start_time (when known).
+    Returns False if the process is gone or its PID now belongs to another process.
+    With pidfds the identity check and the signal target the same process, so there is no race.
+    """
+    pidfd = None
+    try:
+        if _HAS_PIDFD:
+            try:
+                pidfd = os.pidfd_open(pid)
+            except OSError as e:
+                if e.errno == errno.ESRCH:
+                    return False
+                # pidfds unsupported (ENOSYS) or blocked (EPERM): check and signal by PID
+        if start_time is not None and _pid_start_time(pid) not in (start_time, None):
+            return False  # PID recycled by an unrelated process
+        if pidfd is not None:
+            signal.pidfd_send_signal(pidfd, sig)
+        else:
+            os.kill(pid, sig)
+        return True
+    except OSError:
+        return False
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
 
 
 class StateManager:
     def __init__(self, job_id: str):
         self.job_id = job_id
         self.path = STATE_DIR / f"{job_id}.json"
+        self.hb_path = STATE_DIR / f"{job_id}.hb"
+        self._data = None  # Last state this process wrote or read
         STATE_DIR.mkdir(exist_ok=True)
 
+    def load(self) -> dict | None:
+        """Return the cached state, reading the file only if this process has not seen it yet."""
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_bytes())
+            except (json.JSONDecodeError, OSError):
+                return None
+        return self._data
+
+    def _atomic_write(self):
+        """Replace the state file in one step so readers never see a partial or empty file."""
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_bytes(json.dumps(self._data, separators=(",", ":")).encode())
+        os.replace(tmp, self.path)
+
     def initialize(self, pid: int, error_file: str, output_file: str,
                    job_name: str = "", is_array: bool = False):
-        data = {
+        self._data = {
             "job_id": self.job_id,
             "monitor_pid": pid,
+            "pid_start_time": _pid_start_time(pid),
             "error_file": error_file,
             "output_file": output_file,
             "job_name": job_name,
@@ -27,83 +96,137 @@ class StateManager:
             "heartbeat": time.time(),
             "status": "monitoring",
         }
-        self.path.write_text(json.dumps(data, indent=2))
+        self._atomic_write()
 
-    def write_heartbeat(self):
-        if not self.path.exists():
-            return
-        data = json.loads(self.path.read_text())
-        data["heartbeat"] = time.time()
-        self.path.write_text(json.dumps(data, indent=2))
+    def write_heartbeat(self, interval: float):
+        """Record liveness in the <job_id>.hb sidecar; the JSON is only rewritten on transitions.
+        interval is how many seconds may pass before the next heartbeat."""
+        tmp = self.hb_path.with_suffix(".hb.tmp")
+        tmp.write_bytes(f"{time.time()} {interval}".encode())
+        os.replace(tmp, self.hb_path)  # Readers never see a truncated sidecar
+
+    @staticmethod
+    def _read_heartbeat(path: Path) -> tuple[float | None, float | None]:
+        """(last heartbeat, announced interval) for the state file at path, from the sidecar.
+        Falls back to (file mtime, None) when there is no sidecar yet, and returns (None, None)
+        when it exists but cannot be read: the heartbeat is unknown and callers probe the PID."""
+        try:
+            raw = path.with_suffix(".hb").read_bytes()
+        except FileNotFoundError:
+            return path.stat().st_mtime, None
+        except OSError:
+            return None, None
+        try:
+            fields = raw.split()
+            return float(fields[0]), (float(fields[1]) if len(fields) > 1 else None)
+        except (ValueError, IndexError):
+            return None, None
 
     def mark_complete(self, final_state: str):
-        if not self.path.exists():
+        data = self.load()
+        if data is None:
             return
-        data = json.loads(self.path.read_text())
         data["status"] = "complete"
         data["final_state"] = final_state
         data["completed_at"] = time.time()
-        self.path.write_text(json.dumps(data, indent=2))
+        self._atomic_write()
+        self.hb_path.unlink(missing_ok=True)
 
     def exists_and_alive(self) -> bool:
         """Check if a monitor for this job is already running."""
-        if not self.path.exists():
-            return False
         try:
-            data = json.loads(self.path.read_text())
+            data = json.loads(self.path.read_bytes())
+            data["heartbeat"], data["heartbeat_interval"] = self._read_heartbeat(self.path)
         except (json.JSONDecodeError, OSError):
             return False
-        if data.get("status") != "monitoring":
+        return self._monitor_alive(data)
+
+    @staticmethod
+    def _pid_alive(pid, start_time: int | None = None) -> bool:
+        """True if pid is running and, when start_time is known, is still the same process."""
+        try:
+            if _HAS_PIDFD:
+                try:
+                    os.close(os.pidfd_open(pid))
+                except OSError as e:
+                    if e.errno == errno.ESRCH:
+                        return False
+                    os.kill(pid, 0)  # pidfds unsupported (ENOSYS) or blocked (EPERM)
+            else:
+                os.kill(pid, 0)
+        except (OSError, TypeError):
             return False
-        pid = data.get("monitor_pid")
-        if pid is None:
+        # A PID recycled by an unrelated process has a different start time
+        return start_time is None or _pid_start_time(pid) in (start_time, None)
+
+    @classmethod
+    def _monitor_alive(cls, data: dict) -> bool:
+        """True if data describes a monitoring job whose monitor is still running."""
+        if data.get("status") != "monitoring":
             return False
+        if data["heartbeat"] is not None and time.time() - data["heartbeat"] > STALE_HEARTBEAT_SECS:
+            return False  # Long silent: dead or hung, and its PID may have been reused
+        return cls._pid_alive(data.get("monitor_pid"), data.get("pid_start_time"))
+
+    @classmethod
+    def _load_state(cls, path: str) -> dict | None:
+        """Read one state file and attach its heartbeat; None if it is unreadable."""
         try:
-            os.kill(pid, 0)
-            return True
-        except OSError:
+            with open(path, "rb") as f:
+                data = json.loads(f.read())
+            data["heartbeat"], data["heartbeat_interval"] = cls._read_heartbeat(Path(path))
+        except (json.JSONDecodeError, OSError):
+            return None
+        return data
+
+    @classmethod
+    def _heartbeat_fresh(cls, data: dict) -> bool:
+        """True if data describes a monitoring job whose monitor heartbeated on schedule.
+        An unknown heartbeat (unreadable sidecar) is judged by probing the PID instead."""
+        if data.get("status") != "monitoring":
             return False
+        if data["heartbeat"] is None:
+            return cls._pid_alive(data.get("monitor_pid"), data.get("pid_start_time"))
+        interval = data.get("heartbeat_interval") or DEFAULT_HEARTBEAT_INTERVAL
+        return time.time() - data["heartbeat"] < 2 * interval + HEARTBEAT_GRACE
 
     @classmethod
-    def list_all(cls) -> list:
-        """List all state files with alive-check."""
+    def _iter_states(cls):
+        """Yield the state of every readable state file, in job-id order, with its heartbeat."""
         STATE_DIR.mkdir(exist_ok=True)
-        results = []
-        for f in sorted(STATE_DIR.glob("*.json")):
-            try:
-                data = json.loads(f.read_text())
-            except (json.JSONDecodeError, OSError):
-                continue
+        with os.scandir(STATE_DIR) as it:
+            paths = sorted(e.path for e in it if e.name.endswith(".json"))
+        if len(paths) > 1:
+            # Reads are I/O-bound; on NFS/Lustre overlapping them hides per-file round trips
+            with ThreadPoolExecutor(max_workers=min(LOAD_WORKERS, len(paths))) as ex:
+                states = list(ex.map(cls._load_state, paths))
+        else:
+            states = [cls._load_state(path) for path in paths]
+        for data in states:
+            if data is not None:
+                yield data
 
-            if data.get("status") == "monitoring":
-                pid = data.get("monitor_pid")
-                try:
-                    os.kill(pid, 0)
-                    data["monitor_alive"] = True
-                except (OSError, TypeError):
-                    data["monitor_alive"] = False
-            else:
-                data["monitor_alive"] = False
+    @classmethod
+    def scan(cls, probe_pids: bool = True) -> tuple[list, list]:
+        """Read every state file once. Returns (all states with alive-check, recoverable states).
+        Recoverable means still in 'monitoring' state but the monitor is dead.
+        With probe_pids=False liveness is judged from heartbeats alone, without any syscalls
+        unless a heartbeat is unreadable."""
+        alive = cls._monitor_alive if probe_pids else cls._heartbeat_fresh
+        all_states, recoverable = [], []
+        for data in cls._iter_states():
+            data["monitor_alive"] = alive(data)
+            all_states.append(data)
+            if data.get("status") == "monitoring" and not data["monitor_alive"]:
+                recoverable.append(data)
+        return all_states, recoverable
 
-            results.append(data)
-        return results
+    @classmethod
+    def list_all(cls, probe_pids: bool = True) -> list:
+        """List all state files with alive-check."""
+        return cls.scan(probe_pids)[0]
 
     @classmethod
     def list_recoverable(cls) -> list:
         """List jobs that are still in 'monitoring' state but whose monitor is dead."""
-        STATE_DIR.mkdir(exist_ok=True)
-        results = []
-        for f in sorted(STATE_DIR.glob("*.json")):
-            try:
-                data = json.loads(f.read_text())
-            except (json.JSONDecodeError, OSError):
-                continue
-            if data.get("status") != "monitoring":
-                continue
-            pid = data.get("monitor_pid")
-            try:
-                os.kill(pid, 0)
-                # Monitor still alive, skip
-            except (OSError, TypeError):
-                results.append(data)
-        return results
+        return cls.scan()[1]
@@ -3,6 +3,31 @@
 import os
 import re
 import subprocess
+from pathlib import Path
+
+_JOB_ID_RE = re.compile(rb"Submitted batch job (\d+)")
+
+# sbatch flags that take a value, so the next argument is not the script
+_VALUE_FLAGS = frozenset({
+    "-p", "--partition", "-o", "--output", "-e", "--error",
+    "-J", "--job-name", "-t", "--time", "-n", "--ntasks",
+    "-N", "--nodes", "--mem", "--gres", "-A", "--account",
+    "--wrap", "-w", "--nodelist", "--exclude", "-d", "--dependency",
+    "--cpus-per-task", "--ntasks-per-node", "--mail-type", "--mail-user",
+    "--array", "-q", "--qos", "--constraint", "-C",
+})
+
+# One #SBATCH directive we care about: option, separator, rest of the line
+_SBATCH_RE = re.compile(r"#SBATCH\s+(--error|--output|--job-name|--array|-e|-o|-J|-a)(=|\s+)(.*)")
+# Options read from both the sbatch command line and #SBATCH directives
+_OPTION_KEYS = {
+    "--error": "error", "-e": "error",
+    "--output": "output", "-o": "output",
+    "--job-name": "job_name", "-J": "job_name",
+    "--array": "array", "-a": "array",
+}
+
+_SLURM_VAR_RE = re.compile(r"%[jJAxa]")
 
 
 def submit_job(sbatch_args: list) -> tuple:
@@ -10,20 +35,22 @@ def submit_job(sbatch_args: list) -> tuple:
     Run sbatch with given args.
     Returns (job_id, error_file, output_file, working_dir, job_name, is_array).
     """
+    # Output stays bytes: only the job ID is needed, and it is ASCII
     result = subprocess.run(
         ["sbatch"] + sbatch_args,
         capture_output=True,
-        text=True,
     )
 
     if result.returncode != 0:
-        raise RuntimeError(f"sbatch failed (exit {result.returncode}):\n{result.stderr.strip()}")
+        stderr = result.stderr.decode(errors="replace").strip()
+        raise RuntimeError(f"sbatch failed (exit {result.returncode}):\n{stderr}")
 
-    match = re.search(r"Submitted batch job (\d+)", result.stdout)
+    match = _JOB_ID_RE.search(result.stdout)
     if not match:
-        raise RuntimeError(f"Could not parse job ID from sbatch output:\n{result.stdout.strip()}")
+        stdout = result.stdout.decode(errors="replace").strip()
+        raise RuntimeError(f"Could not parse job ID from sbatch output:\n{stdout}")
 
-    job_id = match.group(1)
+    job_id = match.group(1).decode()
     script_path = _find_script_in_args(sbatch_args)
     working_dir = os.getcwd()
     error_file, output_file, job_name, is_array = _parse_sbatch_directives(
@@ -41,15 +68,8 @@ def _find_script_in_args(args: list) -> str | None:
             skip_next = False
             continue
         if arg.startswith("-"):
-            # Flags that take a value
-            if arg in ("-p", "--partition", "-o", "--output", "-e", "--error",
-                       "-J", "--job-name", "-t", "--time", "-n", "--ntasks",
-                       "-N", "--nodes", "--mem", "--gres", "-A", "--account",
-                       "--wrap", "-w", "--nodelist", "--exclude", "-d", "--dependency",
-                       "--cpus-per-task", "--ntasks-per-node", "--mail-type", "--mail-user",
-                       "--array", "-q", "--qos", "--constraint", "-C"):
-                if "=" not in arg:
-                    skip_next = True
+            if arg in _VALUE_FLAGS:
+                skip_next = True
             continue
         # Non-flag argument is the script
         if os.path.isfile(arg):
@@ -57,20 +77,26 @@ def _find_script_in_args(args: list) -> str | None:
     return None
 
 
-def _extract_directive_value(line: str, key_options: list[str]) -> str | None:
-    """Extract value for a directive (e.g. job name, array) from #SBATCH line."""
-    line_clean = line.replace("#SBATCH", "").strip()
-    for key in key_options:
-        if key in line_clean:
-            if "=" in line_clean:
-                idx = line_clean.index("=")
-                value = line_clean[idx + 1:].strip()
-                return _strip_inline_comment(value)
-            parts = line_clean.split()
-            for i, p in enumerate(parts):
-                if p in (key, key.replace("=", "")) and i + 1 < len(parts):
-                    return _strip_inline_comment(parts[i + 1])
-    return None
+def _parse_script_directives(script_path: str) -> tuple:
+    """Parse #SBATCH directives from a script. Returns (error, output, job_name, is_array)."""
+    try:
+        text = Path(script_path).read_text()
+    except (OSError, UnicodeDecodeError):
+        text = ""
+    script = {}
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if not stripped.startswith("#"):
+            break  # sbatch stops reading directives at the first command
+        match = _SBATCH_RE.match(stripped)
+        if match:
+            option, sep, rest = match.groups()
+            # --opt=value keeps the rest of the line; "-o value" takes one token
+            value = rest.strip() if sep == "=" else rest.split()[0]
+            script[_OPTION_KEYS[option]] = _strip_inline_comment(value) or None
+    return script.get("error"), script.get("output"), script.get("job_name"), "array" in script
 
 
 def _parse_sbatch_directives(script_path: str | None, job_id: str,
@@ -82,39 +108,15 @@ def _parse_sbatch_directives(script_path: str | None, job_id: str,
     is_array = False
 
     # First, check CLI args (they override script directives)
-    cli_error, cli_output = _parse_cli_args(sbatch_args)
-    cli_job_name, cli_array = _parse_cli_job_name_and_array(sbatch_args)
+    cli_error, cli_output, cli_job_name, cli_array = _parse_cli(sbatch_args)
 
     # Then parse script directives
-    script_error = None
-    script_output = None
-    script_job_name = None
+    script_error = script_output = script_job_name = None
     script_array = False
     if script_path:
-        try:
-            with open(script_path) as f:
-                for line in f:
-                    stripped = line.strip()
-                    if not stripped.startswith("#"):
-                        if stripped and not stripped.startswith("#"):
-                            break
-                        continue
-                    if not stripped.startswith("#SBATCH"):
-                        continue
-                    if "--error" in stripped or " -e " in stripped:
-                        script_error = _extract_directive_path(stripped)
-                    if "--output" in stripped or " -o " in stripped:
-                        script_output = _extract_directive_path(stripped)
-                    if "--job-name" in stripped or " -J " in stripped:
-                        script_job_name = _extract_directive_value(
-                            stripped, ["--job-name=", "-J", "--job-name"]
-                        )
-                    if "--array" in stripped or " -a " in stripped:
-                        script_array = _extract_directive_value(
-                            stripped, ["--array=", "-a", "--array"]
-                        ) is not None
-        except (OSError, IOError):
-            pass
+        script_error, script_output, script_job_name, script_array = _parse_script_directives(
+            script_path
+        )
 
     # CLI overrides script
     error_file = cli_error or script_error
@@ -145,42 +147,26 @@ def _parse_sbatch_directives(script_path: str | None, job_id: str,
     return error_file, output_file, job_name, is_array
 
 
-def _parse_cli_args(args: list) -> tuple:
-    """Extract --error and --output from CLI arguments."""
-    error_file = None
-    output_file = None
-    for i, arg in enumerate(args):
-        if arg.startswith("--error=") or arg.startswith("-e="):
-            error_file = arg.split("=", 1)[1]
-        elif arg in ("--error", "-e") and i + 1 < len(args):
-            error_file = args[i + 1]
-        elif arg.startswith("--output=") or arg.startswith("-o="):
-            output_file = arg.split("=", 1)[1]
-        elif arg in ("--output", "-o") and i + 1 < len(args):
-            output_file = args[i + 1]
-    return error_file, output_file
-
-
-def _parse_cli_job_name_and_array(args: list) -> tuple:
-    """Extract --job-name/-J and --array from CLI arguments."""
-    job_name = None
-    has_array = False
+def _parse_cli(args: list) -> tuple:
+    """Extract --error, --output, --job-name and --array from CLI arguments in one pass.
+    Returns (error_file, output_file, job_name, has_array)."""
+    found = {}
     skip_next = False
     for i, arg in enumerate(args):
         if skip_next:
             skip_next = False
             continue
-        if arg.startswith("--job-name=") or arg.startswith("-J="):
-            job_name = arg.split("=", 1)[1]
-        elif arg in ("--job-name", "-J") and i + 1 < len(args):
-            job_name = args[i + 1]
-            skip_next = True
-        elif arg.startswith("--array=") or arg.startswith("-a="):
-            has_array = True
-        elif arg in ("--array", "-a") and i + 1 < len(args):
-            has_array = True
+        flag, eq, value = arg.partition("=")
+        key = _OPTION_KEYS.get(flag)
+        if key is None:
+            continue
+        if not eq:
+            if i + 1 >= len(args):
+                continue
+            value = args[i + 1]
             skip_next = True
-    return job_name or "", has_array
+        found[key] = value
+    return found.get("error"), found.get("output"), found.get("job_name") or "", "array" in found
 
 
 def _strip_inline_comment(value: str) -> str:
@@ -190,19 +176,6 @@ def _strip_inline_comment(value: str) -> str:
     return value
 
 
-def _extract_directive_path(line: str) -> str | None:
-    """Extract file path from a #SBATCH directive line."""
-    # Handle: #SBATCH --error=path or #SBATCH -e path
-    line = line.replace("#SBATCH", "").strip()
-    if "=" in line:
-        value = line.split("=", 1)[1].strip()
-        return _strip_inline_comment(value)
-    parts = line.split()
-    if len(parts) >= 2:
-        return _strip_inline_comment(parts[1].strip())
-    return None
-
-
 def _substitute_slurm_vars(path: str, job_id: str, job_name: str = "",
                           array_task_id: str | None = None,
                           is_array: bool = False) -> str:
@@ -210,14 +183,10 @@ def _substitute_slurm_vars(path: str, job_id: str, job_name: str = "",
     For array jobs, when array_task_id is None we keep %j/%a as placeholders (template).
     When array_task_id is set, we substitute per-sub-task.
     """
-    path = path.replace("%J", job_id)
-    path = path.replace("%A", job_id)
-    path = path.replace("%x", job_name or "")
     if array_task_id is not None:
-        path = path.replace("%j", f"{job_id}_{array_task_id}")
-        path = path.replace("%a", array_task_id)
+        job_part, task_part = f"{job_id}_{array_task_id}", array_task_id
     else:
-        if not is_array:
-            path = path.replace("%j", job_id)
-        # else: leave %j and %a as placeholders for template
-    return path
+        # For array templates %j and %a stay as placeholders
+        job_part, task_part = ("%j" if is_array else job_id), "%a"
+    mapping = {"%J": job_id, "%A": job_id, "%x": job_name or "", "%j": job_part, "%a": task_part}
+    return _SLURM_VAR_RE.sub(lambda m: mapping[m.group(0)], path)
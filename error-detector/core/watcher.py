@@ -0,0 +1,91 @@
+"""Wakes the monitor loop early when a job's log files are written (Linux inotify)."""
+
+import ctypes
+import os
+import select
+import struct
+import time
+
+IN_CLOSE_WRITE = 0x00000008
+IN_Q_OVERFLOW = 0x00004000  # Events were dropped, so any of them may have been ours
+_EVENT = struct.Struct("iIII")  # struct inotify_event header: wd, mask, cookie, len (name follows)
+
+
+def _load_libc():
+    """Return libc with the inotify calls bound, or None where inotify is unavailable."""
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FileWatcher:
+    """Sleeps until one of the given files is closed after writing, or a timeout passes.
+
+    inotify watches the files' directories (so logs created later are seen too); events for other
+    files there, such as other jobs' logs in a shared directory, are ignored.
+    Falls back to a plain time.sleep() when inotify is unavailable or no directory can be watched.
+    Only IN_CLOSE_WRITE is watched: IN_MODIFY would fire on every line a job logs.
+    """
+
+    def __init__(self, paths: list):
+        self.fd = None
+        self.names = {}  # watch descriptor -> basenames of the watched files in that directory
+        libc = _load_libc()
+        if libc is None:
+            return
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return
+        for p in paths:
+            if not p:
+                continue
+            directory, name = os.path.split(os.path.abspath(p))
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE)
+            if wd >= 0:  # The same directory yields the same wd
+                self.names.setdefault(wd, set()).add(os.fsencode(name))
+        if not self.names:
+            os.close(fd)
+            return
+        self.fd = fd
+
+    def wait(self, timeout: float) -> bool:
+        """Block for up to timeout seconds. Returns True if woken by a file event."""
+        if self.fd is None:
+            time.sleep(timeout)
+            return False
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return False
+            if self._drain():
+                return True
+
+    def _drain(self) -> bool:
+        """Read all queued events. Returns True if any was for one of the watched files."""
+        hit = False
+        try:
+            while buf := os.read(self.fd, 4096):
+                pos = 0
+                while pos + _EVENT.size <= len(buf):
+                    wd, mask, _, length = _EVENT.unpack_from(buf, pos)
+                    pos += _EVENT.size
+                    name = buf[pos:pos + length].rstrip(b"\0")
+                    pos += length
+                    if mask & IN_Q_OVERFLOW or name in self.names.get(wd, ()):
+                        hit = True
+        except BlockingIOError:
+            pass
+        return hit
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
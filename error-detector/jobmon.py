@@ -10,25 +10,32 @@ Usage:
     jobmon test-discord                               Test webhook connectivity
 """
 
-import argparse
-import json
 import os
 import signal
 import sys
-import time
 from pathlib import Path
+from types import SimpleNamespace
 
 BASE_DIR = Path(__file__).resolve().parent
 sys.path.insert(0, str(BASE_DIR))
 
-from core.submitter import submit_job
-from core.monitor import daemonize_and_monitor, load_config
-from core.notifier import DiscordNotifier
-from core.state import StateManager
+# Only the state layer is imported up front; each command imports the rest of core/ it needs,
+# so `jobmon status`/`cancel` skip the monitor, submitter and notifier import graph
+from core.state import StateManager, signal_process
+
+# JOBMON_NO_INOTIFY=1: monitors poll on a timer only (e.g. logs on NFS, where writes from compute
+# nodes never raise inotify events on the submit host)
+USE_INOTIFY = os.environ.get("JOBMON_NO_INOTIFY") != "1"
+
+# Column layout of `jobmon status`: Job ID, Status, Monitor, Final State, Error File
+_STATUS_ROW = "{:<12} {:<14} {:<10} {:<16} {}".format
 
 
 def cmd_submit(args):
     """Submit a job via sbatch and start monitoring."""
+    from core.monitor import daemonize_and_monitor
+    from core.submitter import submit_job
+
     sbatch_args = args.sbatch_args
     if not sbatch_args:
         print("Error: No sbatch arguments provided.")
@@ -48,52 +55,47 @@ def cmd_submit(args):
     print(f"[jobmon] Output file: {output_file}")
     print(f"[jobmon] Starting background monitor...")
 
-    daemonize_and_monitor(job_id, error_file, output_file, job_name=job_name, is_array=is_array)
-
-    # Give daemon time to start
-    time.sleep(1)
+    daemonize_and_monitor(job_id, error_file, output_file, job_name=job_name, is_array=is_array,
+                          use_inotify=USE_INOTIFY)
     print(f"[jobmon] Monitor running in background. Check with: jobmon status")
     print(f"[jobmon] Monitor log: {BASE_DIR / 'logs' / f'{job_id}.monitor.log'}")
 
 
 def cmd_watch(args):
     """Monitor an already-submitted job."""
+    from core.monitor import daemonize_and_monitor
+
     job_id = args.job_id
     error_file = args.error
     output_file = args.output
 
     # If files not provided, try to figure them out from sacct or defaults
     if not error_file or not output_file:
-        cwd = os.getcwd()
-        default = os.path.join(cwd, f"slurm-{job_id}.out")
-        if not error_file:
-            error_file = default
-        if not output_file:
-            output_file = default
+        default = os.path.join(os.getcwd(), f"slurm-{job_id}.out")
+        error_file = error_file or default
+        output_file = output_file or default
         print(f"[jobmon] Using default file paths (override with --error/--output):")
         print(f"[jobmon] Error file: {error_file}")
         print(f"[jobmon] Output file: {output_file}")
 
     print(f"[jobmon] Starting monitor for job {job_id}...")
 
-    daemonize_and_monitor(job_id, error_file, output_file, job_name="", is_array=False)
-
-    time.sleep(1)
+    daemonize_and_monitor(job_id, error_file, output_file, job_name="", is_array=False,
+                          use_inotify=USE_INOTIFY)
     print(f"[jobmon] Monitor running in background. Check with: jobmon status")
     print(f"[jobmon] Monitor log: {BASE_DIR / 'logs' / f'{job_id}.monitor.log'}")
 
 
 def cmd_status(args):
     """Show all monitored jobs."""
-    all_states = StateManager.list_all()
+    # Liveness from heartbeats only: no per-monitor PID probe unless a heartbeat is unreadable
+    all_states = StateManager.list_all(probe_pids=False)
 
     if not all_states:
         print("[jobmon] No monitored jobs found.")
         return
 
-    print(f"{'Job ID':<12} {'Status':<14} {'Monitor':<10} {'Final State':<16} {'Error File'}")
-    print("-" * 80)
-
+    lines = [_STATUS_ROW("Job ID", "Status", "Monitor", "Final State", "Error File"), "-" * 80]
     for s in all_states:
         job_id = s.get("job_id", "?")
         status = s.get("status", "?")
@@ -101,10 +103,10 @@ def cmd_status(args):
         monitor_str = "alive" if alive else ("done" if status == "complete" else "DEAD")
         final = s.get("final_state", "-")
         error_f = s.get("error_file", "-")
-        # Truncate long paths
-        if len(error_f) > 35:
-            error_f = "..." + error_f[-32:]
-        print(f"{job_id:<12} {status:<14} {monitor_str:<10} {final:<16} {error_f}")
+        error_f = "..." + error_f[-32:] if len(error_f) > 35 else error_f  # Truncate long paths
+        lines.append(_STATUS_ROW(job_id, status, monitor_str, final, error_f))
+    # One write for the whole table instead of a print() per row
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def cmd_cancel(args):
@@ -116,18 +118,17 @@ def cmd_cancel(args):
         print(f"[jobmon] No monitor found for job {job_id}")
         return
 
-    try:
-        data = json.loads(state.path.read_text())
-    except (json.JSONDecodeError, OSError):
+    # Loaded once: mark_complete() below reuses it instead of re-reading the file
+    data = state.load()
+    if data is None:
         print(f"[jobmon] Could not read state for job {job_id}")
         return
 
     pid = data.get("monitor_pid")
     if pid:
-        try:
-            os.kill(pid, signal.SIGTERM)
+        if signal_process(pid, signal.SIGTERM, data.get("pid_start_time")):
             print(f"[jobmon] Sent SIGTERM to monitor PID {pid}")
-        except OSError:
+        else:
             print(f"[jobmon] Monitor PID {pid} not running")
 
     state.mark_complete("MONITOR_CANCELLED")
@@ -142,38 +143,45 @@ def cmd_recover(args):
         print("[jobmon] No dead monitors to recover.")
         return
 
-    import subprocess
+    from core.monitor import (_check_sacct_all_with_retry, _close_notifiers, _handle_termination,
+                              daemonize_and_monitor)
+    from core.slurm_cache import get_job_states
+
+    # Check which SLURM jobs are still active, from the cached squeue listing where possible
+    slurm_states = get_job_states([data["job_id"] for data in recoverable])
+    to_restart, finished = [], []
     for data in recoverable:
+        (to_restart if slurm_states.get(data["job_id"]) else finished).append(data)
+
+    # Restart live monitors first: each daemonize returns as soon as its daemon is up, and forking
+    # now happens before the final checks below start any notifier threads
+    for data in to_restart:
         job_id = data["job_id"]
-        error_file = data.get("error_file", "")
-        output_file = data.get("output_file", "")
-        job_name = data.get("job_name", "")
-        is_array = data.get("is_array", False)
-
-        # Check if the SLURM job is still active
-        result = subprocess.run(
-            ["squeue", "-j", job_id, "-h", "-o", "%T"],
-            capture_output=True, text=True,
-        )
-        slurm_status = result.stdout.strip()
-
-        if not slurm_status:
-            print(f"[jobmon] Job {job_id}: SLURM job already finished, running final check...")
-            # Job is done but monitor died before completing — run inline
-            from core.monitor import _check_sacct_all_with_retry, _handle_termination
-            sacct_results = _check_sacct_all_with_retry(job_id)
-            sm = StateManager(job_id)
-            _handle_termination(job_id, sacct_results, error_file, output_file, sm, job_name, is_array)
-            print(f"[jobmon] Job {job_id}: recovery complete")
-        else:
-            print(f"[jobmon] Job {job_id}: still {slurm_status}, restarting monitor...")
-            daemonize_and_monitor(job_id, error_file, output_file, job_name=job_name, is_array=is_array)
-            time.sleep(1)
-            print(f"[jobmon] Job {job_id}: monitor restarted")
+        print(f"[jobmon] Job {job_id}: still {slurm_states[job_id]}, restarting monitor...")
+        daemonize_and_monitor(job_id, data.get("error_file", ""), data.get("output_file", ""),
+                              job_name=data.get("job_name", ""), is_array=data.get("is_array", False),
+                              use_inotify=USE_INOTIFY, in_place=False)  # Must return for the next job
+    if to_restart:
+        print(f"[jobmon] Restarted {len(to_restart)} monitor(s): "
+              + ", ".join(data["job_id"] for data in to_restart))
+
+    for data in finished:
+        job_id = data["job_id"]
+        print(f"[jobmon] Job {job_id}: SLURM job already finished, running final check...")
+        # Job is done but monitor died before completing — run inline
+        sacct_results = _check_sacct_all_with_retry(job_id)
+        sm = StateManager(job_id)
+        _handle_termination(job_id, sacct_results, data.get("error_file", ""), data.get("output_file", ""),
+                            sm, data.get("job_name", ""), data.get("is_array", False))
+        _close_notifiers()  # Wait for the queued notifications before exiting
+        print(f"[jobmon] Job {job_id}: recovery complete")
 
 
 def cmd_test_discord(args):
     """Send test messages to both Discord channels."""
+    from core.monitor import load_config
+    from core.notifier import DiscordNotifier
+
     config = load_config()
     notifier = DiscordNotifier(
         config["discord"]["success_webhook"],
@@ -199,6 +207,22 @@ def cmd_test_discord(args):
 
 
 def main():
+    if not sys.stdout.isatty():
+        # Piped or redirected (`jobmon status | grep`, `watch`, logs): emit each line as printed,
+        # as on a terminal
+        sys.stdout.reconfigure(line_buffering=True)
+
+    # Fast path: commands without options skip building (and importing) argparse entirely
+    argv = sys.argv[1:]
+    if argv == ["status"]:
+        return cmd_status(SimpleNamespace())
+    if argv == ["recover"]:
+        return cmd_recover(SimpleNamespace())
+    if len(argv) == 2 and argv[0] == "cancel" and not argv[1].startswith("-"):
+        return cmd_cancel(SimpleNamespace(job_id=argv[1]))
+
+    import argparse
+
     parser = argparse.ArgumentParser(
         prog="jobmon",
         description="SLURM Job Monitor with Discord Notifications",
@@ -208,25 +232,31 @@ def main():
     # submit
     sub = subparsers.add_parser("submit", help="Submit a job and auto-monitor")
     sub.add_argument("sbatch_args", nargs=argparse.REMAINDER, help="Arguments passed to sbatch")
+    sub.set_defaults(func=cmd_submit)
 
     # watch
     sub = subparsers.add_parser("watch", help="Monitor an already-submitted job")
     sub.add_argument("job_id", help="SLURM job ID")
     sub.add_argument("--error", "-e", help="Path to error file")
     sub.add_argument("--output", "-o", help="Path to output file")
+    sub.set_defaults(func=cmd_watch)
 
     # status
-    subparsers.add_parser("status", help="Show active monitors")
+    sub = subparsers.add_parser("status", help="Show active monitors")
+    sub.set_defaults(func=cmd_status)
 
     # cancel
     sub = subparsers.add_parser("cancel", help="Stop monitoring a job")
     sub.add_argument("job_id", help="SLURM job ID")
+    sub.set_defaults(func=cmd_cancel)
 
     # recover
-    subparsers.add_parser("recover", help="Restart dead monitors")
+    sub = subparsers.add_parser("recover", help="Restart dead monitors")
+    sub.set_defaults(func=cmd_recover)
 
     # test-discord
-    subparsers.add_parser("test-discord", help="Test Discord webhook connectivity")
+    sub = subparsers.add_parser("test-discord", help="Test Discord webhook connectivity")
+    sub.set_defaults(func=cmd_test_discord)
 
     args = parser.parse_args()
 
@@ -234,16 +264,7 @@ def main():
         parser.print_help()
         sys.exit(1)
 
-    commands = {
-        "submit": cmd_submit,
-        "watch": cmd_watch,
-        "status": cmd_status,
-        "cancel": cmd_cancel,
-        "recover": cmd_recover,
-        "test-discord": cmd_test_discord,
-    }
-
-    commands[args.command](args)
+    args.func(args)
 
 
 if __name__ == "__main__":